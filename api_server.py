@@ -0,0 +1,133 @@
+"""
+オーガナイザー判定のヘッドレス HTTP JSON API。
+
+    python api_server.py --host 127.0.0.1 --port 8000
+
+エンドポイント:
+    GET  /organizer?room_id=123456            単体判定
+    GET  /organizers?room_id=123456,234567    一括判定
+    POST /organizers  {"room_ids": [123456, 234567]}
+    GET  /healthz
+
+判定ロジックとキャッシュ実装は app.py と同じ sr_core のものを使う（キャッシュ自体はプロセスごとに持つ）。
+"""
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from sr_core import lookup_organizer
+
+MAX_BATCH_SIZE = 100
+BATCH_WORKERS = 8
+
+
+def _parse_room_id(value):
+    """ルームIDを検証して文字列で返す（半角数字以外は None）"""
+    room_id = str(value).strip()
+    # isdigit() は「²」や全角数字も真になるため、ASCII の10進数字だけを受け付ける
+    return room_id if room_id.isascii() and room_id.isdecimal() else None
+
+
+def lookup_organizers(room_ids):
+    """複数ルームを並列に判定し、入力順の結果リストを返す"""
+    def lookup_one(room_id):
+        try:
+            result = lookup_organizer(room_id)
+        except Exception:
+            return {"room_id": room_id, "error": "lookup_failed"}
+        if result is None:
+            return {"room_id": room_id, "error": "not_found"}
+        return result
+
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as executor:
+        return list(executor.map(lookup_one, room_ids))
+
+
+class OrganizerAPIHandler(BaseHTTPRequestHandler):
+    server_version = "SROrganizerAPI/1.0"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send_json(status, {"error": message})
+
+    def _handle_batch(self, raw_room_ids):
+        if not raw_room_ids:
+            return self._send_error(400, "room_ids is required")
+        if len(raw_room_ids) > MAX_BATCH_SIZE:
+            return self._send_error(400, f"too many room_ids (max {MAX_BATCH_SIZE})")
+
+        room_ids = [_parse_room_id(r) for r in raw_room_ids]
+        if None in room_ids:
+            return self._send_error(400, "room_ids must be numeric")
+
+        self._send_json(200, {"results": lookup_organizers(room_ids)})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/healthz":
+            return self._send_json(200, {"status": "ok"})
+
+        if url.path == "/organizer":
+            room_id = _parse_room_id(query.get("room_id", [""])[0])
+            if room_id is None:
+                return self._send_error(400, "room_id must be numeric")
+            try:
+                result = lookup_organizer(room_id)
+            except Exception:
+                return self._send_error(500, "lookup failed")
+            if result is None:
+                return self._send_error(404, "room not found")
+            return self._send_json(200, result)
+
+        if url.path == "/organizers":
+            raw = ",".join(query.get("room_id", []))
+            return self._handle_batch([r for r in raw.split(",") if r.strip()])
+
+        self._send_error(404, "not found")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/organizers":
+            return self._send_error(404, "not found")
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            raw_room_ids = payload.get("room_ids", [])
+        except (ValueError, AttributeError):
+            return self._send_error(400, "invalid JSON body")
+
+        if not isinstance(raw_room_ids, list):
+            return self._send_error(400, "room_ids must be a list")
+        self._handle_batch(raw_room_ids)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="SRオーガナイザー確認 JSON API")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8000)
+    args = arg_parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), OrganizerAPIHandler)
+    print(f"SROrganizerAPI listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
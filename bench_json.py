@@ -0,0 +1,130 @@
+"""
+イベント参加ルーム一覧APIの JSON デコードコストを計測するスクリプト。
+
+    python bench_json.py
+
+実際のレスポンスに近い形のダミーデータ（1,000ルーム = 50件 × 20ページ）を返すよう
+requests.get を差し替え、本番と同じ fetch_event_room_list_page → _decode_json の経路で
+デコーダー（標準 json / orjson）とフィールド射影（EVENT_ROOM_FIELDS）の有無ごとに
+CPU 時間と、メモリ確保量（ピーク / キャッシュに残る量）を比較する。
+"""
+import json
+import time
+import tracemalloc
+
+import sr_core
+
+ROOMS = 1000
+PAGE_SIZE = 50
+REPEAT = 20
+
+
+def _dummy_room(i):
+    """event/room_list API の1ルーム分に近い形のダミーデータ"""
+    return {
+        "room_id": 100000 + i,
+        "room_name": f"ルーム{i} 🎤 配信中",
+        "room_url_key": f"room_key_{i}",
+        "room_description": "はじめまして！毎日配信しています。" * 5,
+        "image": f"https://static.showroom-live.com/image/room/{i}.jpeg?v=1",
+        "image_m": f"https://static.showroom-live.com/image/room/{i}_m.jpeg?v=1",
+        "image_s": f"https://static.showroom-live.com/image/room/{i}_s.jpeg?v=1",
+        "is_online": i % 3 == 0,
+        "is_official": i % 2 == 0,
+        "genre_id": 200,
+        "follower_num": 1234 + i,
+        "rank": i + 1,
+        "point": 5000000 - i * 1000,
+        "gap": 1000,
+        "created_at": 1600000000 + i,
+        "organizer_id": 10 + i % 50,
+        "event_entry": {
+            "quest_level": i % 30,
+            "level": i % 30,
+            "entry_id": 900000 + i,
+            "event_id": 40000,
+            "room_id": 100000 + i,
+            "point": 5000000 - i * 1000,
+        },
+        "avatar": {"list": [f"https://static.showroom-live.com/avatar/{j}.png" for j in range(5)]},
+    }
+
+
+def _dummy_pages():
+    pages = []
+    for start in range(0, ROOMS, PAGE_SIZE):
+        rooms = [_dummy_room(i) for i in range(start, start + PAGE_SIZE)]
+        pages.append(json.dumps({
+            "list": rooms,
+            "current_page": start // PAGE_SIZE + 1,
+            "next_page": None,
+            "last_page": ROOMS // PAGE_SIZE,
+            "total_entries": ROOMS,
+        }, ensure_ascii=False).encode("utf-8"))
+    return pages
+
+
+class _StubResponse:
+    """fetch_event_room_list_page が参照する属性だけを持つダミーレスポンス"""
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+def _fetch_all_pages(page_count):
+    all_rooms = []
+    for page in range(1, page_count + 1):
+        rooms, _ = sr_core.fetch_event_room_list_page(40000, page)
+        all_rooms.extend(rooms)
+    return all_rooms
+
+
+def measure(page_count):
+    """(1,000ルームあたりの CPU ミリ秒, ピーク確保量 KB, 保持量 KB) を返す"""
+    started = time.process_time()
+    for _ in range(REPEAT):
+        _fetch_all_pages(page_count)
+    cpu_ms = (time.process_time() - started) * 1000 / REPEAT
+
+    tracemalloc.start()
+    rooms = _fetch_all_pages(page_count)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rooms
+    return cpu_ms, peak / 1024, retained / 1024
+
+
+def main():
+    pages = _dummy_pages()
+    backends = ["json"]
+    try:
+        sr_core._get_json_loads("orjson")
+        backends.append("orjson")
+    except ImportError:
+        print("orjson 未インストールのため標準 json のみ計測します")
+
+    selected = "orjson" if sr_core._get_json_loads() is not json.loads else "json"
+    print(f"SR_JSON_BACKEND={sr_core.JSON_BACKEND} で使われるデコーダー: {selected}")
+    print(f"{ROOMS} ルーム / {len(pages)} ページ, 本文 {sum(map(len, pages)) / 1024:.0f} KB")
+    print(f"{'デコーダー':<8} {'射影':<4} {'CPU ms':>8} {'ピーク KB':>10} {'保持 KB':>10}")
+
+    original = (sr_core.requests.get, sr_core.JSON_BACKEND, sr_core._project_event_room)
+    sr_core.requests.get = lambda url, params=None, **kwargs: _StubResponse(pages[params["p"] - 1])
+    try:
+        for backend in backends:
+            sr_core.JSON_BACKEND = backend
+            for project in (False, True):
+                # 射影なしの比較用に、射影関数だけを素通しに差し替える
+                sr_core._project_event_room = original[2] if project else (lambda data: data)
+                cpu_ms, peak_kb, retained_kb = measure(len(pages))
+                print(f"{backend:<8} {'あり' if project else 'なし':<4} {cpu_ms:>8.2f} {peak_kb:>10.0f} {retained_kb:>10.0f}")
+    finally:
+        sr_core.requests.get, sr_core.JSON_BACKEND, sr_core._project_event_room = original
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+sr_core の起動コスト（import 時間・常駐メモリ）を計測し、予算内かを確認するスクリプト。
+
+    python bench_startup.py
+
+新しいプロセスで import を行うため、コンテナのコールドスタートに近い値が得られる。
+予算を超えた場合、または重いライブラリが読み込まれた場合は終了コード 1 を返す。
+"""
+import json
+import os
+import subprocess
+import sys
+
+# --- 予算 ---
+IMPORT_TIME_BUDGET_MS = 300
+RSS_DELTA_BUDGET_MB = 30
+FORBIDDEN_MODULES = ("pandas", "numpy", "dateutil", "streamlit")
+RUNS = 5
+
+_PROBE = r"""
+import json, resource, sys, time
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+import sr_core
+elapsed = time.perf_counter() - t0
+rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "import_ms": elapsed * 1000,
+    "rss_delta_mb": (rss_after - rss_before) / 1024,
+    "loaded": sorted(m for m in %r if m in sys.modules),
+}))
+""" % (FORBIDDEN_MODULES,)
+
+
+def measure_once():
+    """新しいインタープリタで sr_core を import して計測値を返す"""
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    return json.loads(out)
+
+
+def main():
+    results = [measure_once() for _ in range(RUNS)]
+    import_ms = sorted(r["import_ms"] for r in results)[RUNS // 2]
+    rss_delta_mb = max(r["rss_delta_mb"] for r in results)
+    loaded = sorted(set(m for r in results for m in r["loaded"]))
+
+    print(f"import sr_core: {import_ms:.1f} ms (中央値, 予算 {IMPORT_TIME_BUDGET_MS} ms)")
+    print(f"RSS 増分: {rss_delta_mb:.1f} MB (最大, 予算 {RSS_DELTA_BUDGET_MB} MB)")
+    print(f"重いライブラリ: {', '.join(loaded) if loaded else 'なし'}")
+
+    ok = (
+        import_ms <= IMPORT_TIME_BUDGET_MS
+        and rss_delta_mb <= RSS_DELTA_BUDGET_MB
+        and not loaded
+    )
+    print("OK" if ok else "予算超過")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
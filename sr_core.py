@@ -0,0 +1,849 @@
+"""
+SRオーガナイザー確認のデータ取得・判定ロジック。
+
+Streamlit に依存しないため、UI（app.py）以外のバッチスクリプト等からも
+軽量に import できる。pandas / NumPy などの重いライブラリはここでは読み込まない。
+"""
+import collections
+import contextlib
+import csv
+import datetime
+import functools
+import importlib.util
+import json
+import math
+import os
+import re
+import threading
+import time
+
+import requests
+
+JST = datetime.timezone(datetime.timedelta(hours=9))
+
+# --- 定数設定 ---
+ROOM_LIST_URL = "https://mksoul-pro.com/showroom/file/room_list.csv"
+ORGANIZER_LIST_URL = "https://mksoul-pro.com/showroom/file/organizer_list.csv"
+EVENT_LIVER_LIST_URL = "https://mksoul-pro.com/showroom/file/event_liver_list.csv"
+EXCLUDED_AVATAR_IDS_URL = "https://mksoul-pro.com/tool/pr-liver-update-avatar/excluded_avatar_ids.txt"
+ROOM_PROFILE_API = "https://www.showroom-live.com/api/room/profile?room_id={room_id}"
+API_EVENT_ROOM_LIST_URL = "https://www.showroom-live.com/api/event/room_list"
+HEADERS = {}
+
+# キャッシュ保持時間（秒）。app.py と api_server.py は同じキャッシュ実装を使う（キャッシュはプロセスごとに別）
+PROFILE_CACHE_TTL = 300
+EVENT_ROOM_LIST_CACHE_TTL = 300
+REFERENCE_CSV_CACHE_TTL = 600
+CACHE_MAX_ENTRIES = 512 # キャッシュ1つあたりの最大件数（超えた分は古い順に破棄）
+
+# 設定すると、取得したイベント参加ルーム一覧をこのディレクトリにスナップショット保存する（sr_snapshot 参照）
+SNAPSHOT_DIR = os.environ.get("SR_SNAPSHOT_DIR")
+
+# 1 以上を設定すると、イベント参加ルーム一覧の取得後に上位 N ルームを先読みする（sr_prefetch 参照）
+PREFETCH_TOP_N = int(os.environ.get("SR_PREFETCH_TOP_N", "0"))
+
+# JSON デコーダー: "auto"（orjson があれば使用）/ "orjson" / "json"（標準ライブラリ）
+JSON_BACKEND = os.environ.get("SR_JSON_BACKEND", "auto")
+JSON_BACKENDS = ("auto", "orjson", "json")
+
+# イベント参加ルーム一覧APIで実際に参照するキー（それ以外は保持しない）
+# 値が None のキーはそのまま、辞書の場合は入れ子のキーをさらに絞り込む
+# 射影はデコード後に行うため CPU 時間は減らない（orjson では 1,000 ルームあたり数 ms 増える）。
+# 目的はキャッシュやスナップショットに保持するメモリの削減（約 1/4 になる）。bench_json.py 参照
+EVENT_ROOM_FIELDS = {
+    "room_id": None,
+    "room_name": None,
+    "rank": None,
+    "point": None,
+    "score": None,
+    "created_at": None,
+    "organizer_id": None,
+    "entry_level": None,
+    "event_entry": {"quest_level": None, "level": None},
+}
+
+GENRE_MAP = {
+    112: "ミュージック", 102: "アイドル", 103: "タレント", 104: "声優",
+    105: "芸人", 107: "バーチャル", 108: "モデル", 109: "俳優",
+    110: "アナウンサー", 113: "クリエイター", 200: "ライバー",
+}
+
+# --- ユーティリティ関数 ---
+
+def _iter_csv_rows(url, timeout=10):
+    """
+    参照CSVをストリーミングで1行ずつ読み出す（pandas 不使用）。
+    空行は読み飛ばす。呼び出し側が途中で打ち切れば残りはダウンロードしない。
+    """
+    with _http_get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        # text/csv は charset 未指定だと ISO-8859-1 扱いになるため UTF-8（BOM 除去）を明示
+        response.encoding = "utf-8-sig"
+        for row in csv.reader(response.iter_lines(decode_unicode=True)):
+            if row:
+                yield row
+
+
+class _Uncached:
+    """_ttl_cache に保存させずに値を返すためのラッパー（途中で失敗した取得結果など）"""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def _ttl_cache(ttl_seconds, cache_empty=False, maxsize=CACHE_MAX_ENTRIES):
+    """
+    引数ごとに戻り値を一定時間キャッシュするデコレーター（スレッドセーフ）。
+    None や空の結果は取得失敗の可能性があるため保存しない。
+    取得失敗を例外で通知する関数では cache_empty=True で空の結果も保存できる。
+    関数が _Uncached(値) を返した場合は、値をそのまま返して保存しない。
+    同じ引数の呼び出しが同時に来た場合は、最初の1件だけが取得し他はその結果を待つ。
+    保存時に期限切れの項目を削除し、maxsize を超えたら最も長く使われていない項目から破棄する。
+    """
+    def decorator(func):
+        store = collections.OrderedDict()
+        lock = threading.Lock()
+        inflight = {} # キー → [取得中のロック, 待機中のスレッド数]
+
+        def lookup(key):
+            hit = store.get(key)
+            if hit is not None and hit[0] > time.monotonic():
+                store.move_to_end(key)
+                return True, hit[1]
+            return False, None
+
+        def save(key, value):
+            now = time.monotonic()
+            for expired_key in [k for k, (expires, _) in store.items() if expires <= now]:
+                del store[expired_key]
+            store[key] = (now + ttl_seconds, value)
+            store.move_to_end(key)
+            while len(store) > maxsize:
+                store.popitem(last=False)
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = tuple(str(a) for a in args)
+            with lock:
+                found, value = lookup(key)
+                if found:
+                    return value
+                entry = inflight.setdefault(key, [threading.Lock(), 0])
+                entry[1] += 1
+
+            try:
+                with entry[0]:
+                    # 待っている間に別スレッドが取得を終えていればその結果を使う
+                    with lock:
+                        found, value = lookup(key)
+                    if found:
+                        return value
+
+                    value = func(*args)
+                    if isinstance(value, _Uncached):
+                        return value.value
+                    if value is not None and (value or cache_empty):
+                        with lock:
+                            save(key, value)
+                    return value
+            finally:
+                with lock:
+                    entry[1] -= 1
+                    if entry[1] == 0:
+                        inflight.pop(key, None)
+
+        def cache_clear():
+            with lock:
+                store.clear()
+
+        def is_cached(*args):
+            key = tuple(str(a) for a in args)
+            with lock:
+                return lookup(key)[0]
+
+        wrapper.cache_clear = cache_clear
+        wrapper.is_cached = is_cached
+        return wrapper
+    return decorator
+
+
+def _check_json_backend(backend):
+    """
+    JSON デコーダーの指定を検証する。不正な値は ValueError、
+    orjson を明示したのにインストールされていない場合は ImportError。
+    """
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"SR_JSON_BACKEND の値が不正です: {backend!r}（{' / '.join(JSON_BACKENDS)}）")
+    if backend == "orjson" and importlib.util.find_spec("orjson") is None:
+        raise ImportError("SR_JSON_BACKEND=orjson ですが orjson がインストールされていません")
+
+
+# 設定ミスが「取得失敗」として握りつぶされないよう、import 時に検証する（orjson 自体は使用時に import）
+_check_json_backend(JSON_BACKEND)
+
+_json_loaders = {}
+
+
+def _get_json_loads(backend=None):
+    """
+    デコード関数を返す（backend 省略時は JSON_BACKEND、初回のみ import）。
+    "auto" のときだけ、orjson がなければ標準ライブラリに切り替える。
+    """
+    backend = JSON_BACKEND if backend is None else backend
+    loads = _json_loaders.get(backend)
+    if loads is None:
+        _check_json_backend(backend)
+        loads = json.loads
+        if backend != "json":
+            try:
+                import orjson
+                loads = orjson.loads
+            except ImportError:
+                if backend == "orjson":
+                    raise
+        _json_loaders[backend] = loads
+    return loads
+
+
+def _decode_json(response):
+    """レスポンス本文を JSON としてデコードする（不正な JSON は ValueError）"""
+    return _get_json_loads()(response.content)
+
+
+def _compile_projection(fields):
+    """
+    fields（EVENT_ROOM_FIELDS 形式）に含まれるキーだけを残す関数を作る。
+    ルームごとに fields を辿り直さないよう、キーの一覧を先に展開しておく。
+    """
+    keys = tuple(fields)
+    nested = tuple(
+        (key, _compile_projection(sub_fields))
+        for key, sub_fields in fields.items() if sub_fields is not None
+    )
+
+    def project(data):
+        if not isinstance(data, dict):
+            return data
+        projected = {key: data[key] for key in keys if key in data}
+        for key, sub_project in nested:
+            if key in projected:
+                projected[key] = sub_project(projected[key])
+        return projected
+
+    return project
+
+
+_project_event_room = _compile_projection(EVENT_ROOM_FIELDS)
+
+
+_interactive_lock = threading.Lock()
+_interactive_count = 0
+_interactive_idle = threading.Event()
+_interactive_idle.set()
+
+
+@contextlib.contextmanager
+def interactive_request():
+    """
+    UI / API からの対話的な処理中であることを示すコンテキストマネージャー。
+    この間、バックグラウンドの先読みは待機する。
+    """
+    global _interactive_count
+    with _interactive_lock:
+        _interactive_count += 1
+        _interactive_idle.clear()
+    try:
+        yield
+    finally:
+        with _interactive_lock:
+            _interactive_count -= 1
+            if _interactive_count == 0:
+                _interactive_idle.set()
+
+
+def wait_for_interactive_idle(timeout=None):
+    """対話的な処理がなくなるまで待つ。timeout 内に空けば True を返す"""
+    return _interactive_idle.wait(timeout)
+
+
+_prefetch_state = threading.local()
+
+
+@contextlib.contextmanager
+def prefetch_context(throttle):
+    """
+    バックグラウンド先読み中であることを示すコンテキストマネージャー（スレッド単位）。
+    この間は新たな先読みを予約せず、HTTP リクエストの直前に毎回 throttle() を呼ぶ。
+    """
+    _prefetch_state.throttle = throttle
+    try:
+        yield
+    finally:
+        _prefetch_state.throttle = None
+
+
+def _in_prefetch():
+    return getattr(_prefetch_state, "throttle", None) is not None
+
+
+def _http_get(url, **kwargs):
+    """requests.get の薄いラッパー。先読み中はリクエストごとにレート制限をかける"""
+    throttle = getattr(_prefetch_state, "throttle", None)
+    if throttle is not None:
+        throttle()
+    return requests.get(url, **kwargs)
+
+
+def _safe_get(data, keys, default_value=None):
+    """ネストされた辞書から安全に値を取得するヘルパー関数"""
+    temp = data
+    for key in keys:
+        if isinstance(temp, dict) and key in temp:
+            temp = temp.get(key)
+        else:
+            return default_value
+    # 取得した値がNone、空の文字列、またはNaNの場合もデフォルト値を返す
+    if temp is None or (isinstance(temp, str) and temp.strip() == "") or (isinstance(temp, float) and math.isnan(temp)):
+        return default_value
+    return temp
+
+def get_official_mark(room_id):
+    """簡易的な公/フ判定"""
+    try:
+        room_id = int(room_id)
+        if room_id < 100000:
+            return "公"
+        elif room_id >= 100000:
+            return "フ"
+        else:
+            return "不明"
+    except (TypeError, ValueError):
+        return "不明"
+
+
+@_ttl_cache(PROFILE_CACHE_TTL)
+def get_room_profile(room_id):
+    """ライバー（ルーム）プロフィール情報APIからデータを取得する"""
+    url = ROOM_PROFILE_API.format(room_id=room_id)
+    try:
+        response = _http_get(url, timeout=10)
+        response.raise_for_status()
+        return _decode_json(response)
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+
+
+def get_monthly_fan_info(room_id, ym):
+    url = "https://www.showroom-live.com/api/active_fan/users"
+    params = {
+        "room_id": room_id,
+        "ym": ym,
+        "offset": 0,
+        "limit": 1
+    }
+    try:
+        r = _http_get(url, params=params, timeout=10)
+        r.raise_for_status()
+        data = _decode_json(r)
+        return (
+            data.get("total_user_count", "-"),
+            data.get("fan_power", "-")
+        )
+    except Exception:
+        return "-", "-"
+
+
+AVATAR_ID_PATTERN = re.compile(r'/avatar/(\d+)\.png')
+
+
+@_ttl_cache(REFERENCE_CSV_CACHE_TTL, cache_empty=True)
+def _load_excluded_avatar_ids():
+    """excluded_avatar_ids.txt をアバターID（int）の集合として読み込む"""
+    r = _http_get(EXCLUDED_AVATAR_IDS_URL, timeout=10)
+    r.raise_for_status()
+    # isdigit() は「²」なども真になり int() で失敗するため、isdecimal() で判定する
+    return frozenset(int(line) for line in map(str.strip, r.text.splitlines()) if line.isdecimal())
+
+
+def get_excluded_avatar_ids():
+    """除外アバターID（int）の集合を返す。一度読み込んだ後は一定時間再取得しない"""
+    try:
+        return _load_excluded_avatar_ids()
+    except Exception:
+        return frozenset()
+
+
+def count_valid_avatars(profile_data):
+    return count_valid_avatars_batch([profile_data])[0]
+
+
+def count_valid_avatars_batch(profiles):
+    """
+    複数ルームのプロフィールについて、除外対象以外のアバター数をまとめて数える。
+    除外リストは1回だけ参照し、プロフィールと同じ順でカウントのリストを返す。
+    アバター一覧が取得できないプロフィールは "-" になる。
+    """
+    excluded_ids = get_excluded_avatar_ids()
+    search = AVATAR_ID_PATTERN.search
+    counts = []
+
+    for profile_data in profiles:
+        avatar_list = _safe_get(profile_data, ["avatar", "list"], [])
+        if not isinstance(avatar_list, list):
+            counts.append("-")
+            continue
+
+        count = 0
+        for url in avatar_list:
+            m = search(url) if isinstance(url, str) else None
+            if m and int(m.group(1)) not in excluded_ids:
+                count += 1
+        counts.append(count)
+
+    return counts
+
+
+def get_room_event_meta(profile_event_id, room_id):
+    """
+    ルーム作成日時・オーガナイザーID取得
+    条件① profile.event.event_id
+    条件③ event_liver_list.csv
+    """
+    created_str, organizer_id, _ = _resolve_room_event_meta(profile_event_id, room_id)
+    return created_str, organizer_id
+
+
+def _resolve_room_event_meta(profile_event_id, room_id):
+    """get_room_event_meta の本体。どのイベントIDで見つかったか（取得元）も返す"""
+    checked_event_ids = []
+
+    # --- 条件① ---
+    if profile_event_id:
+        checked_event_ids.append((profile_event_id, "profile_event"))
+
+    # --- 条件③ ---
+    fallback_event_id = get_event_id_from_event_liver_list(room_id)
+    if fallback_event_id:
+        checked_event_ids.append((fallback_event_id, "event_liver_list"))
+
+    # --- イベントID候補を順に試す ---
+    for event_id, source in checked_event_ids:
+        rooms = get_event_room_list_data(event_id)
+        for r in rooms:
+            if str(r.get("room_id")) == str(room_id):
+                created_at = r.get("created_at")
+                organizer_id = r.get("organizer_id")
+
+                created_str = "-"
+                if created_at:
+                    created_str = datetime.datetime.fromtimestamp(
+                        created_at, JST
+                    ).strftime("%Y/%m/%d %H:%M:%S")
+
+                return created_str, organizer_id, source
+
+    # --- 条件④ ---
+    return "-", "-", None
+
+
+def resolve_organizer_name(organizer_id, official_status, room_id):
+    """
+    オーガナイザーIDに基づいてオーガナイザー名を解決する。
+    オーガナイザーリストに見つからない場合、「わかりませんでした<(_ _*)>」を返す。
+    """
+    organizer_name, _ = _resolve_organizer(organizer_id, official_status, room_id)
+    return organizer_name
+
+
+def _resolve_organizer(organizer_id, official_status, room_id):
+    """resolve_organizer_name の本体。判定に使った条件（取得元）も返す"""
+    NOT_FOUND_MSG = "わかりませんでした<(_ _*)>"
+
+    # --- フリー ---
+    if official_status != "公式":
+        return "フリー", "free"
+
+    # --- 条件②：MKsoul ---
+    if is_mksoul_room(room_id):
+        return "MKsoul", "mksoul_room_list"
+
+    # --- 条件①：既存オーガナイザー ---
+    if organizer_id in (None, "-", 0):
+        # 💡 修正点: ハイフンの場合も「わかりませんでした<(_ _*)>」を返す
+        return NOT_FOUND_MSG, "not_found"
+
+    organizer_id_str = str(int(organizer_id))
+
+    try:
+        organizer_name = _load_organizer_map().get(organizer_id_str)
+        if organizer_name is not None:
+            return organizer_name, "organizer_list"
+
+        # 👈 修正: オーガナイザーリストに見つからない場合は指定の文字列を返す
+        return NOT_FOUND_MSG, "not_found"
+
+    except Exception:
+        # 👈 修正: CSV読み込みなどのエラーが発生した場合も指定の文字列を返す
+        return NOT_FOUND_MSG, "not_found"
+
+
+@_ttl_cache(REFERENCE_CSV_CACHE_TTL, cache_empty=True)
+def _load_organizer_map():
+    """organizer_list.csv を {オーガナイザーID: オーガナイザー名} として読み込む"""
+    organizers = {}
+    rows = _iter_csv_rows(ORGANIZER_LIST_URL)
+    next(rows, None) # ヘッダー行を読み飛ばす
+
+    for row in rows:
+        if len(row) == 1:
+            # 区切りが空白の1列形式の場合は「ID 名前」に分割する
+            parts = row[0].strip().split(None, 1)
+            if len(parts) < 2:
+                continue
+            row_id, row_name = parts
+        else:
+            row_id, row_name = row[0], row[1]
+        organizers.setdefault(row_id.strip(), row_name.strip())
+
+    return organizers
+
+
+@_ttl_cache(REFERENCE_CSV_CACHE_TTL, cache_empty=True)
+def _load_mksoul_room_ids():
+    """room_list.csv の MKsoul 所属ルームID一覧を読み込む（先頭2行は対象外）"""
+    room_ids = set()
+    for i, row in enumerate(_iter_csv_rows(ROOM_LIST_URL)):
+        if i >= 2:
+            room_ids.add(row[0].strip())
+    return room_ids
+
+
+@_ttl_cache(REFERENCE_CSV_CACHE_TTL, cache_empty=True)
+def _load_event_liver_map():
+    """event_liver_list.csv を {ルームID: イベントID} として読み込む"""
+    event_ids = {}
+    for row in _iter_csv_rows(EVENT_LIVER_LIST_URL):
+        event_ids.setdefault(row[0], row[1] if len(row) > 1 else "")
+    return event_ids
+
+
+def is_mksoul_room(room_id):
+    try:
+        return str(room_id) in _load_mksoul_room_ids()
+    except Exception:
+        return False
+
+
+def get_event_id_from_event_liver_list(room_id):
+    try:
+        return _load_event_liver_map().get(str(room_id)) or None
+    except Exception:
+        return None
+
+
+
+# --- イベント情報取得関数群 ---
+
+def get_total_entries(event_id):
+    """イベント参加者総数を取得する（これはページネーションの必要なし）"""
+    params = {"event_id": event_id}
+    try:
+        # 1ページ目を取得して total_entries を確認
+        response = _http_get(API_EVENT_ROOM_LIST_URL, headers=HEADERS, params=params, timeout=10)
+        if response.status_code == 404:
+            return 0
+        response.raise_for_status()
+        data = _decode_json(response)
+        return data.get('total_entries', 0)
+    except requests.exceptions.RequestException:
+        return "N/A"
+    except ValueError:
+        return "N/A"
+
+
+EVENT_ROOM_LIST_PAGE_SIZE = 50 # 1ページあたりの取得件数（SHOWROOM APIの標準値）
+
+
+def fetch_event_room_list_page(event_id, page, count=EVENT_ROOM_LIST_PAGE_SIZE):
+    """
+    イベント参加ルーム一覧APIの1ページ分を取得する。
+    (ルームリスト, 次ページの有無) を返す。404 の場合は ([], False)。
+    ネットワークエラーなどは例外のまま呼び出し側に返す。
+    """
+    params = {"event_id": event_id, "p": page, "count": count}
+    resp = _http_get(API_EVENT_ROOM_LIST_URL, headers=HEADERS, params=params, timeout=15)
+
+    if resp.status_code == 404:
+        # 404エラーの場合はイベントIDが存在しないか終了している
+        return [], False
+
+    resp.raise_for_status()
+    data = _decode_json(resp)
+
+    current_page_rooms = []
+    has_next_page = True
+
+    # APIレスポンスからリストデータを抽出
+    if isinstance(data, dict):
+        # 複数のキー名からルームリストを取得
+        for k in ('list', 'room_list', 'event_entry_list', 'entries', 'data', 'event_list'):
+            if k in data and isinstance(data[k], list):
+                current_page_rooms = data[k]
+                break
+
+        # --- ★ ページネーション制御の主要な修正点 ★ ---
+        next_page = data.get('next_page')
+        last_page = data.get('last_page')
+
+        # next_page が None または last_page を超えている場合は、次のページがないと判断
+        if next_page is None or (last_page is not None and next_page > last_page):
+            has_next_page = False
+
+    elif isinstance(data, list):
+        # リスト形式で返ってきた場合（非推奨だが念のため対応）
+        current_page_rooms = data
+        # リスト形式の場合は、リストの長さで次のページがあるかを判断（APIの仕様次第で不確実）
+        if len(current_page_rooms) < count:
+            has_next_page = False
+    else:
+        # データ形式が不正
+        has_next_page = False
+
+    # 参照するキーだけを残す（キャッシュやスナップショットに不要なデータを持たない）
+    current_page_rooms = [_project_event_room(room) for room in current_page_rooms]
+
+    return current_page_rooms, has_next_page
+
+
+def get_event_room_list_data(event_id):
+    """
+    全参加者リストを取得する。（ページネーション対応を API のメタ情報に基づいて強化）
+    """
+    cached = _fetch_event_room_list_data.is_cached(event_id)
+    all_rooms = _fetch_event_room_list_data(event_id)
+
+    # 新たにキャッシュに載った場合だけ先読みを予約する（先読み側の再取得を防ぐ。
+    # 途中で失敗した不完全なリストはキャッシュされないため先読みもしない）
+    # 先読み中の取得からはさらに先読みを予約しない（イベントをまたいだ連鎖を防ぐ）
+    if (PREFETCH_TOP_N > 0 and all_rooms and not cached and not _in_prefetch()
+            and _fetch_event_room_list_data.is_cached(event_id)):
+        _schedule_event_prefetch(event_id, all_rooms)
+
+    return all_rooms
+
+
+@_ttl_cache(EVENT_ROOM_LIST_CACHE_TTL)
+def _fetch_event_room_list_data(event_id):
+    """
+    get_event_room_list_data の本体（全ページ取得、結果はキャッシュされる）。
+    途中のページで失敗した場合は、取得できた分だけをキャッシュせずに返す。
+    """
+    all_rooms, complete = fetch_event_room_list(event_id)
+
+    if not complete:
+        # 不完全なリストはキャッシュにもスナップショットにも残さない
+        return _Uncached(all_rooms)
+
+    if SNAPSHOT_DIR and all_rooms:
+        _export_event_snapshot(event_id, all_rooms)
+
+    return all_rooms
+
+
+def fetch_event_room_list(event_id):
+    """
+    イベントの全ページを取得し、(ルームリスト, 途中で失敗せず全ページ取得できたか) を返す。
+    キャッシュやスナップショットの自動保存は行わない。
+    """
+    all_rooms = []
+    page = 1 # ページカウンター ('p' パラメーターの値)
+    max_pages = 50 # 無限ループ防止のため最大ページ数を設定 (50 * 50 = 2500ルームまで取得を試みる)
+
+    # ページネーション制御用のフラグ
+    has_next_page = True
+    complete = True # 途中のページで失敗していないか
+
+    while page <= max_pages and has_next_page:
+        try:
+            # ページごとにAPIをリクエスト
+            current_page_rooms, has_next_page = fetch_event_room_list_page(event_id, page)
+
+            if not current_page_rooms:
+                # ルームリストが空であれば、これ以上データがないと判断してループ終了
+                break
+
+            all_rooms.extend(current_page_rooms)
+
+            # next_page 情報が取れていればそれを利用、取れていなければページカウンターをインクリメント
+            if has_next_page:
+                page = page + 1 # 次のページへ
+
+        except Exception as e:
+            # ネットワークエラーなどで中断
+            print(f"イベントリスト取得エラー: Event ID {event_id}, Page {page}, Error: {e}")
+            complete = False
+            break
+
+    return all_rooms, complete
+
+
+def _export_event_snapshot(event_id, rooms):
+    """取得したルームリストをスナップショット保存する（失敗しても取得処理は続行）"""
+    try:
+        from sr_snapshot import export_event_snapshot
+        export_event_snapshot(event_id, rooms, SNAPSHOT_DIR)
+    except Exception as e:
+        print(f"スナップショット保存エラー: Event ID {event_id}, Error: {e}")
+
+
+def _schedule_event_prefetch(event_id, rooms):
+    """同じイベントの上位ルームのバックグラウンド先読みを予約する"""
+    try:
+        from sr_prefetch import schedule_event_prefetch
+        schedule_event_prefetch(event_id, rooms, PREFETCH_TOP_N)
+    except Exception as e:
+        print(f"先読み予約エラー: Event ID {event_id}, Error: {e}")
+
+def get_event_participants_info(event_id, target_room_id, limit=10):
+    """
+    イベント参加ルーム情報・状況APIから必要な情報を抽出する。
+    ターゲットルームの順位、ポイント、レベルを確実に取得する。（検索ロジックを最終強化）
+    """
+    # ターゲットルームIDを文字列に統一（APIのJSON内のID型と合わせるため）
+    target_room_id_str = str(target_room_id).strip()
+    
+    if not event_id:
+        return {"total_entries": "-", "rank": "-", "point": "-", "level": "-", "top_participants": []}
+
+    # 全参加者リストを取得（全ページ分を取得するロジックを信頼する）
+    # キャッシュを書き換えないよう、各ルームの辞書はコピーして扱う
+    room_list_data = [dict(room) for room in get_event_room_list_data(event_id)]
+    total_entries = get_total_entries(event_id)
+    current_room_data = None
+    
+    # --- 🎯 ターゲットルームの情報を、取得できたリスト全体から確実に探す（修正ロジック） ---
+    # 上位10件以降で見つからない問題を解決するため、全リストを探索
+    for room in room_list_data:
+        # room_id が存在し、文字列化したものがターゲットIDと一致するか確認
+        room_id_in_list = room.get("room_id")
+        if room_id_in_list is not None and str(room_id_in_list).strip() == target_room_id_str:
+            current_room_data = room
+            break # 見つけたらすぐにループを抜ける
+            
+    # --- 🎯 ターゲットルームの参加状況を確定 ---
+    rank = None
+    point = None
+    level = None
+    
+    if current_room_data:
+        # _safe_get を使用して安全に値を取得
+        rank = _safe_get(current_room_data, ["rank"], default_value=None)
+        
+        point = _safe_get(current_room_data, ["point"], default_value=None)
+        if point is None:
+            point = _safe_get(current_room_data, ["score"], default_value=None)
+        
+        level = _safe_get(current_room_data, ["event_entry", "quest_level"], default_value=None)
+        if level is None:
+            level = _safe_get(current_room_data, ["entry_level"], default_value=None)
+        if level is None:
+            level = _safe_get(current_room_data, ["event_entry", "level"], default_value=None)
+    
+    # 取得結果の None を表示用のハイフンに変換 (0や有効な値はそのまま残る)
+    rank = "-" if rank is None else rank
+    point = "-" if point is None else point
+    level = "-" if level is None else level
+    # ------------------------------------------------------------------------------------
+
+    # --- 上位10ルームのリストを作成し、エンリッチメント処理に進む ---
+    top_participants = room_list_data
+    if top_participants:
+        # point/score は文字列またはNoneの可能性があるため、intにキャストしてソート
+        top_participants.sort(key=lambda x: int(str(x.get('point', x.get('score', 0)) or 0)), reverse=True)
+    
+    # 上位10件に制限する（表示用）
+    top_participants_for_display = top_participants[:limit]
+
+
+    # ✅ 上位10ルームのプロフィール情報を取得し、データをエンリッチ（統合）
+    enriched_participants = []
+    for participant in top_participants_for_display:
+        room_id = participant.get('room_id')
+        
+        # 取得必須のキーを初期化（Noneで初期化）
+        for key in ['room_level_profile', 'show_rank_subdivided', 'follower_num', 'live_continuous_days', 'is_official_api']: 
+            participant[key] = None
+            
+        if room_id:
+            # プロフィールAPIへの呼び出し
+            profile = get_room_profile(room_id)
+            if profile:
+                # プロフィールAPIから取得した「ルームレベル」を 'room_level_profile' として格納
+                participant['room_level_profile'] = _safe_get(profile, ["room_level"], None)
+                participant['show_rank_subdivided'] = _safe_get(profile, ["show_rank_subdivided"], None)
+                participant['follower_num'] = _safe_get(profile, ["follower_num"], None)
+                participant['live_continuous_days'] = _safe_get(profile, ["live_continuous_days"], None)
+                participant['is_official_api'] = _safe_get(profile, ["is_official"], None)
+                
+                if not participant.get('room_name'):
+                    participant['room_name'] = _safe_get(profile, ["room_name"], f"Room {room_id}")
+        
+        # イベントの「レベル」を取得 ('event_entry.quest_level' またはその他のキーから)
+        participant['quest_level'] = _safe_get(participant, ["event_entry", "quest_level"], None)
+        if participant['quest_level'] is None:
+            participant['quest_level'] = _safe_get(participant, ["entry_level"], None)
+        if participant['quest_level'] is None:
+            participant['quest_level'] = _safe_get(participant, ["event_entry", "level"], None)
+
+        # 最終的に quest_level がセットされていない場合、ここでキーを追加（DataFrame化でエラーが出ないように）
+        if 'quest_level' not in participant:
+            participant['quest_level'] = None
+
+        enriched_participants.append(participant)
+
+    # 応答に必要な情報を返す
+    return {
+        "total_entries": total_entries if isinstance(total_entries, int) and total_entries > 0 else "-",
+        "rank": rank,
+        "point": point,
+        "level": level, # ターゲットルームのレベル
+        "top_participants": enriched_participants, # エンリッチされたリストを返す
+    }
+# --- イベント情報取得関数群ここまで ---
+
+
+# --- オーガナイザー判定パイプライン ---
+
+def lookup_organizer(room_id):
+    """
+    get_room_profile → get_room_event_meta → resolve_organizer_name を順に実行し、
+    判定結果を JSON 化しやすい辞書で返す。プロフィールが取得できない場合は None を返す。
+    """
+    with interactive_request():
+        return _lookup_organizer(room_id)
+
+
+def _lookup_organizer(room_id):
+    """lookup_organizer の本体（バックグラウンド先読みからはこちらを直接呼ぶ）"""
+    profile_data = get_room_profile(room_id)
+    if not profile_data:
+        return None
+
+    is_official = _safe_get(profile_data, ["is_official"], None)
+    official_status = "公式" if is_official is True else "フリー" if is_official is False else "-"
+
+    event_id = _safe_get(profile_data, ["event", "event_id"], None)
+    created_at, organizer_id, event_source = _resolve_room_event_meta(event_id, room_id)
+    organizer_name, organizer_source = _resolve_organizer(organizer_id, official_status, room_id)
+
+    return {
+        "room_id": str(room_id),
+        "room_name": _safe_get(profile_data, ["room_name"], None),
+        "official_status": official_status,
+        "created_at": None if created_at == "-" else created_at,
+        "organizer_id": None if organizer_id in (None, "-") else organizer_id,
+        "organizer_name": organizer_name,
+        "source": organizer_source,
+        "event_source": event_source,
+    }
@@ -0,0 +1,148 @@
+"""
+イベント参加ルームのバックグラウンド先読み。
+
+イベント参加ルーム一覧を取得した後、同じイベントの上位 N ルームについて
+プロフィールとオーガナイザー判定を先に実行し、キャッシュを温めておく。
+続けて同じイベントの別ルームを確認した際に即座に結果を返せるようにする。
+
+    SR_PREFETCH_TOP_N=20 SR_PREFETCH_RATE=2 streamlit run app.py
+
+先読みは1本のデーモンスレッドで順に処理し、HTTP リクエストを秒間 rate 件までに制限する
+（1ルームの判定で複数のリクエストが発生しても、その1件ずつが制限の対象）。
+先読み中の取得から別イベントの先読みが予約されることはない。
+UI / API の対話的な処理中（sr_core.interactive_request）はリクエストの前に待機し、いつでも取り消せる。
+"""
+import os
+import queue
+import threading
+import time
+
+from sr_core import (
+    _lookup_organizer,
+    get_room_profile,
+    prefetch_context,
+    wait_for_interactive_idle,
+)
+
+DEFAULT_RATE = float(os.environ.get("SR_PREFETCH_RATE", "2")) # 先読みの HTTP リクエスト数（1秒あたり）
+
+
+def _top_room_ids(rooms, top_n):
+    """ポイント順に上位 top_n ルームのIDを返す（get_event_participants_info と同じ並び）"""
+    ranked = sorted(
+        rooms,
+        key=lambda x: int(str(x.get('point', x.get('score', 0)) or 0)),
+        reverse=True,
+    )
+    return [str(r.get("room_id")) for r in ranked[:top_n] if r.get("room_id")]
+
+
+class EventPrefetcher:
+    """イベント単位の先読みジョブを順に処理するバックグラウンドワーカー"""
+
+    def __init__(self, rate=DEFAULT_RATE):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._last_request = 0.0
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._generations = {} # イベントID → 最新ジョブの世代
+        self._epoch = 0 # cancel() で全ジョブを無効化するための世代
+        self._stop = threading.Event()
+        self._thread = None
+
+    def schedule(self, event_id, rooms, top_n):
+        """上位 top_n ルームの先読みを予約する（同じイベントの古いジョブは取り消す）"""
+        event_id = str(event_id)
+        room_ids = _top_room_ids(rooms, top_n)
+        if not room_ids:
+            return
+
+        with self._lock:
+            generation = self._generations.get(event_id, 0) + 1
+            self._generations[event_id] = generation
+            self._jobs.put((event_id, generation, self._epoch, room_ids))
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="sr-prefetch", daemon=True)
+                self._thread.start()
+
+    def cancel(self, event_id=None):
+        """先読みを取り消す（event_id 省略時は全イベント）"""
+        with self._lock:
+            if event_id is None:
+                self._epoch += 1
+            else:
+                event_id = str(event_id)
+                self._generations[event_id] = self._generations.get(event_id, 0) + 1
+
+    def shutdown(self, timeout=None):
+        """全ての先読みを取り消してワーカーを停止する"""
+        self.cancel()
+        self._stop.set()
+        self._jobs.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _is_current(self, event_id, generation, epoch):
+        with self._lock:
+            return (
+                not self._stop.is_set()
+                and epoch == self._epoch
+                and generation == self._generations.get(event_id)
+            )
+
+    def _run(self):
+        while not self._stop.is_set():
+            job = self._jobs.get()
+            if job is None:
+                break
+            self._prefetch_event(*job)
+
+    def _prefetch_event(self, event_id, generation, epoch, room_ids):
+        for room_id in room_ids:
+            # 対話的な処理を優先し、空くまで待つ（取り消しにも反応できるよう短く区切る）
+            while not wait_for_interactive_idle(0.5):
+                if not self._is_current(event_id, generation, epoch):
+                    return
+            if not self._is_current(event_id, generation, epoch):
+                return
+            if get_room_profile.is_cached(room_id):
+                continue
+
+            try:
+                with prefetch_context(self._throttle):
+                    _lookup_organizer(room_id)
+            except Exception as e:
+                print(f"先読みエラー: Event ID {event_id}, Room ID {room_id}, Error: {e}")
+
+    def _throttle(self):
+        """先読み中の HTTP リクエストの直前に呼ばれる（対話的な処理の待機とレート制限）"""
+        while not wait_for_interactive_idle(0.5):
+            if self._stop.is_set():
+                return
+        delay = self._last_request + self.interval - time.monotonic()
+        if delay > 0:
+            # 停止時は待たずに抜ける
+            self._stop.wait(delay)
+        self._last_request = time.monotonic()
+
+
+_default_prefetcher = None
+_default_lock = threading.Lock()
+
+
+def get_prefetcher():
+    """プロセス共通の先読みワーカーを返す"""
+    global _default_prefetcher
+    with _default_lock:
+        if _default_prefetcher is None:
+            _default_prefetcher = EventPrefetcher()
+        return _default_prefetcher
+
+
+def schedule_event_prefetch(event_id, rooms, top_n):
+    get_prefetcher().schedule(event_id, rooms, top_n)
+
+
+def cancel_prefetch(event_id=None):
+    get_prefetcher().cancel(event_id)
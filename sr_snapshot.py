@@ -0,0 +1,157 @@
+"""
+イベント参加ルーム一覧の列指向スナップショット（Arrow IPC 形式）。
+
+取得したルームリストを、取得時刻ごとに追記専用のファイルとして保存する。
+SR_SNAPSHOT_DIR による自動保存は、途中のページで失敗せず全ページ取得できた場合のみ行う。
+
+    snapshots/event_id=<イベントID>/date=<YYYY-MM-DD>/<HHMMSS_ffffff>.arrow
+
+Arrow IPC（Feather v2）ファイルはメモリマップで開けるため、過去の順位推移を
+再ダウンロードなしで高速に参照できる。pyarrow が必要（使用時のみ import する）。
+"""
+import datetime
+import os
+
+from sr_core import JST, _safe_get, fetch_event_room_list
+
+DEFAULT_SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_SUFFIX = ".arrow"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError("スナップショット機能には pyarrow が必要です（pip install pyarrow）") from e
+    return pyarrow
+
+
+def _snapshot_schema(pa):
+    return pa.schema([
+        ("fetched_at", pa.timestamp("ms", tz="Asia/Tokyo")),
+        ("room_id", pa.int64()),
+        ("rank", pa.int64()),
+        ("point", pa.int64()),
+        ("quest_level", pa.int64()),
+        ("organizer_id", pa.int64()),
+        ("created_at", pa.int64()),
+    ])
+
+
+def _to_int(value):
+    """数値または数字文字列を int に変換する（変換できない場合は None）"""
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _room_to_row(room):
+    point = _safe_get(room, ["point"], None)
+    if point is None:
+        point = _safe_get(room, ["score"], None)
+
+    quest_level = _safe_get(room, ["event_entry", "quest_level"], None)
+    if quest_level is None:
+        quest_level = _safe_get(room, ["entry_level"], None)
+    if quest_level is None:
+        quest_level = _safe_get(room, ["event_entry", "level"], None)
+
+    return {
+        "room_id": _to_int(room.get("room_id")),
+        "rank": _to_int(_safe_get(room, ["rank"], None)),
+        "point": _to_int(point),
+        "quest_level": _to_int(quest_level),
+        "organizer_id": _to_int(room.get("organizer_id")),
+        "created_at": _to_int(room.get("created_at")),
+    }
+
+
+def _event_dir(base_dir, event_id):
+    return os.path.join(base_dir, f"event_id={event_id}")
+
+
+def export_event_snapshot(event_id, rooms=None, base_dir=DEFAULT_SNAPSHOT_DIR, fetched_at=None):
+    """
+    ルームリストを1つのスナップショットファイルとして追記保存し、そのパスを返す。
+    rooms を省略した場合は全ページを取得し直す（キャッシュや自動保存は使わない）。
+    途中のページで失敗した不完全なリストは保存せず RuntimeError を送出する。
+    """
+    pa = _require_pyarrow()
+
+    if rooms is None:
+        rooms, complete = fetch_event_room_list(event_id)
+        if not complete:
+            raise RuntimeError(f"ルームリストを全ページ取得できなかったため保存しません: Event ID {event_id}")
+    if fetched_at is None:
+        fetched_at = datetime.datetime.now(JST)
+    fetched_at = fetched_at.astimezone(JST)
+
+    rows = [_room_to_row(room) for room in rooms]
+    columns = {name: [row[name] for row in rows] for name in rows[0]} if rows else {}
+    columns["fetched_at"] = [fetched_at] * len(rows)
+    schema = _snapshot_schema(pa)
+    table = pa.table({name: columns.get(name, []) for name in schema.names}, schema=schema)
+
+    partition_dir = os.path.join(_event_dir(base_dir, event_id), f"date={fetched_at:%Y-%m-%d}")
+    os.makedirs(partition_dir, exist_ok=True)
+    path = os.path.join(partition_dir, f"{fetched_at:%H%M%S_%f}{SNAPSHOT_SUFFIX}")
+    if os.path.exists(path):
+        raise FileExistsError(f"スナップショットが既に存在します: {path}")
+
+    # 書き込み途中のファイルを読まれないよう、一時ファイルに書いてから置き換える
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def list_snapshot_files(event_id, base_dir=DEFAULT_SNAPSHOT_DIR, start_date=None, end_date=None):
+    """イベントのスナップショットファイルを古い順に返す（日付は datetime.date で絞り込み）"""
+    event_dir = _event_dir(base_dir, event_id)
+    if not os.path.isdir(event_dir):
+        return []
+
+    paths = []
+    for partition in sorted(os.listdir(event_dir)):
+        if not partition.startswith("date="):
+            continue
+        date = datetime.date.fromisoformat(partition[len("date="):])
+        if (start_date and date < start_date) or (end_date and date > end_date):
+            continue
+        partition_dir = os.path.join(event_dir, partition)
+        paths.extend(
+            os.path.join(partition_dir, name)
+            for name in sorted(os.listdir(partition_dir))
+            if name.endswith(SNAPSHOT_SUFFIX)
+        )
+    return paths
+
+
+def read_event_snapshots(event_id, base_dir=DEFAULT_SNAPSHOT_DIR, start_date=None, end_date=None):
+    """イベントのスナップショットをメモリマップで読み込み、1つの pyarrow.Table にして返す"""
+    pa = _require_pyarrow()
+    tables = []
+    for path in list_snapshot_files(event_id, base_dir, start_date, end_date):
+        with pa.memory_map(path, "r") as source:
+            tables.append(pa.ipc.open_file(source).read_all())
+
+    if not tables:
+        return _snapshot_schema(pa).empty_table()
+    return pa.concat_tables(tables)
+
+
+def get_rank_history(event_id, room_id, base_dir=DEFAULT_SNAPSHOT_DIR, start_date=None, end_date=None):
+    """
+    保存済みスナップショットから1ルームの順位推移を取得する。
+    [{"fetched_at", "rank", "point", "quest_level"}, ...] を取得時刻順で返す。
+    """
+    pa = _require_pyarrow()
+    table = read_event_snapshots(event_id, base_dir, start_date, end_date)
+    table = table.filter(pa.compute.equal(table["room_id"], int(room_id)))
+    table = table.select(["fetched_at", "rank", "point", "quest_level"]).sort_by("fetched_at")
+    return table.to_pylist()
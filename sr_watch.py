@@ -0,0 +1,214 @@
+"""
+イベント順位のウォッチモード（差分更新）。
+
+    python sr_watch.py --rooms 123456,234567 --events 40001,40002 --interval 180
+
+初回だけイベントの全ページを取得してスナップショットを作り、以降は監視対象ルームが
+載っている可能性のあるページ（上位ページから順に、最も深い監視ルームのページ＋余裕分）
+だけを再取得する。監視ルームが見つからなければ見つかるまで深さを広げ、
+最後まで走査しても見つからないルームは不参加として以降の深さの判断から外す。
+不参加のルームも FULL_RESCAN_POLLS 回に1回の全走査で探し直す。
+順位・ポイントに変化があったルームは変化イベント（辞書）として通知する。
+"""
+import argparse
+import datetime
+import json
+import time
+
+from sr_core import (
+    JST,
+    _safe_get,
+    fetch_event_room_list_page,
+    get_room_profile,
+)
+
+DEFAULT_INTERVAL = 180 # ポーリング間隔（秒）
+PAGE_MARGIN = 1 # 最も深い監視ルームのページより何ページ先まで見るか
+MAX_PAGES = 50 # get_event_room_list_data と同じ上限
+FULL_RESCAN_POLLS = 10 # 何回に1回、不参加のルームも含めて全ページを走査し直すか
+
+
+def _rank_and_point(room):
+    """ルームリストの1件から (順位, ポイント) を取り出す"""
+    rank = _safe_get(room, ["rank"], None)
+    point = _safe_get(room, ["point"], None)
+    if point is None:
+        point = _safe_get(room, ["score"], None)
+    return rank, point
+
+
+def print_change(change):
+    """変化イベントを1行の JSON として標準出力に書き出す（既定の通知先）"""
+    print(json.dumps(change, ensure_ascii=False), flush=True)
+
+
+class EventRankWatcher:
+    """
+    複数イベント × 複数ルームの順位・ポイントを定期的に差分取得する。
+    snapshots は {event_id: {room_id: {"rank", "point", "page"}}} を保持する。
+    イベントへの参加・離脱は、前後どちらかの順位・ポイントが None の変化イベントとして通知する。
+    """
+
+    def __init__(self, room_ids, event_ids=None, interval=DEFAULT_INTERVAL, on_change=print_change):
+        self.room_ids = {str(r) for r in room_ids}
+        self.event_ids = [str(e) for e in event_ids] if event_ids else self._events_from_profiles()
+        self.interval = interval
+        self.on_change = on_change
+        self.snapshots = {}
+        self.absent = {} # イベントID → 最後まで走査しても見つからなかったルームID
+        self.poll_counts = {}
+        self.request_count = 0
+
+    def _events_from_profiles(self):
+        """イベントID未指定の場合、各ルームのプロフィールから参加中イベントを集める"""
+        event_ids = []
+        for room_id in sorted(self.room_ids):
+            event_id = _safe_get(get_room_profile(room_id), ["event", "event_id"], None)
+            if event_id is not None and str(event_id) not in event_ids:
+                event_ids.append(str(event_id))
+        return event_ids
+
+    def _fetch_page(self, event_id, page):
+        self.request_count += 1
+        return fetch_event_room_list_page(event_id, page)
+
+    def _scan_event(self, event_id, seeking, depth):
+        """
+        上位ページから順に取得し、監視ルーム（self.room_ids）の現在値を {room_id: {...}} で返す。
+        depth ページまで取得した時点で seeking のルームが全て見つかっていれば打ち切る。
+        (現在値, 最後のページまで走査したか) を返す。
+        """
+        found = {}
+        page = 1
+        has_next_page = True
+
+        while page <= MAX_PAGES and has_next_page:
+            rooms, has_next_page = self._fetch_page(event_id, page)
+            if not rooms:
+                break
+
+            for room in rooms:
+                room_id = str(room.get("room_id"))
+                if room_id in self.room_ids:
+                    rank, point = _rank_and_point(room)
+                    found[room_id] = {"rank": rank, "point": point, "page": page}
+
+            if page >= depth and seeking <= found.keys():
+                return found, False
+            page += 1
+
+        return found, True
+
+    def poll_event(self, event_id, checked_at):
+        """1イベント分を差分取得し、変化イベントのリストを返す"""
+        previous = self.snapshots.get(event_id)
+        absent = self.absent.get(event_id, set())
+        polls = self.poll_counts.get(event_id, 0) + 1
+        self.poll_counts[event_id] = polls
+
+        if previous is None or polls % FULL_RESCAN_POLLS == 0:
+            # 初回・定期的な全走査: 不参加と判定したルームも含めて探し直す
+            seeking = set(self.room_ids)
+            depth = MAX_PAGES
+        else:
+            # 不参加と確定したルームは探さない（見えている範囲に現れれば拾う）
+            seeking = self.room_ids - absent
+            pages = [previous[r]["page"] for r in seeking if r in previous]
+            # 探すルームがなければ1ページ目だけ確認する（上位に現れた参加ルームは拾う）
+            depth = max(pages) + PAGE_MARGIN if pages else 1
+
+        current, complete = self._scan_event(event_id, seeking, depth)
+
+        if previous is None:
+            # 取得エラーは例外として poll() で処理されるため、最後まで走査して空なら「誰も参加していない」。
+            # 走査が途中で打ち切られた場合だけスナップショットを作らず次回やり直す
+            if complete:
+                self.snapshots[event_id] = current
+                self.absent[event_id] = self.room_ids - current.keys()
+            elif current:
+                self.snapshots[event_id] = current
+                self.absent[event_id] = set()
+            return []
+
+        # 最後まで走査して見つからなかったルームは不参加として記録し、深さの判断から外す
+        if complete:
+            self.absent[event_id] = self.room_ids - current.keys()
+        else:
+            self.absent[event_id] = absent - current.keys()
+
+        changes = []
+        for room_id in sorted(current.keys() | previous.keys()):
+            before = previous.get(room_id)
+            entry = current.get(room_id)
+            if entry is None:
+                if not complete:
+                    # 走査範囲外にいるだけの可能性があるため前回値を引き継ぐ
+                    current[room_id] = before
+                    continue
+                entry = {"rank": None, "point": None}
+            if before is None:
+                before = {"rank": None, "point": None}
+            if (before["rank"], before["point"]) != (entry["rank"], entry["point"]):
+                changes.append({
+                    "event_id": event_id,
+                    "room_id": room_id,
+                    "rank_before": before["rank"],
+                    "rank": entry["rank"],
+                    "point_before": before["point"],
+                    "point": entry["point"],
+                    "checked_at": checked_at,
+                })
+
+        self.snapshots[event_id] = current
+        return changes
+
+    def poll(self):
+        """全イベントを1回ずつ差分取得し、変化イベントを通知して返す"""
+        checked_at = datetime.datetime.now(JST).strftime("%Y/%m/%d %H:%M:%S")
+        changes = []
+        for event_id in self.event_ids:
+            try:
+                changes.extend(self.poll_event(event_id, checked_at))
+            except Exception as e:
+                # ネットワークエラーなどは次回のポーリングで再試行する
+                print(f"ウォッチ取得エラー: Event ID {event_id}, Error: {e}")
+
+        for change in changes:
+            self.on_change(change)
+        return changes
+
+    def run(self, max_polls=None):
+        """interval 秒ごとに poll を繰り返す（max_polls 指定時はその回数で終了）"""
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            started = time.monotonic()
+            self.poll()
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+def _split_ids(value):
+    return [v.strip() for v in value.split(",") if v.strip()] if value else []
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="イベント順位のウォッチモード")
+    arg_parser.add_argument("--rooms", required=True, help="監視するルームID（カンマ区切り）")
+    arg_parser.add_argument("--events", help="監視するイベントID（カンマ区切り、省略時はプロフィールから取得）")
+    arg_parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="ポーリング間隔（秒）")
+    arg_parser.add_argument("--max-polls", type=int, default=None)
+    args = arg_parser.parse_args()
+
+    watcher = EventRankWatcher(_split_ids(args.rooms), _split_ids(args.events), args.interval)
+    try:
+        watcher.run(args.max_polls)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"APIリクエスト数: {watcher.request_count}")
+
+
+if __name__ == "__main__":
+    main()